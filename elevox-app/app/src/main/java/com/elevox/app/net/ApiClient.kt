@@ -1,10 +1,9 @@
 package com.elevox.app.net
 
 import com.elevox.app.BuildConfig
-import com.elevox.app.R
 import com.squareup.moshi.Moshi
 import com.squareup.moshi.kotlin.reflect.KotlinJsonAdapterFactory
-import okhttp3.CertificatePinner
+import okhttp3.Interceptor
 import okhttp3.OkHttpClient
 import okhttp3.logging.HttpLoggingInterceptor
 import okhttp3.tls.HandshakeCertificates
@@ -14,9 +13,8 @@ import retrofit2.http.Body
 import retrofit2.http.GET
 import retrofit2.http.POST
 import retrofit2.Response
-import java.security.cert.CertificateFactory
-import java.security.cert.X509Certificate
 import java.util.concurrent.TimeUnit
+import javax.net.ssl.SSLPeerUnverifiedException
 
 data class DadosRequest(
 	val currentFloor: Int,
@@ -42,48 +40,36 @@ interface StatusApi {
 object ApiClient {
 	private val baseUrl: String = "https://${BuildConfig.ESP32_HOST}/"
 
-	private fun computePinFromRaw(): String? {
-		return try {
-			val cf = CertificateFactory.getInstance("X.509")
-			val certInput = com.elevox.app.AppContext.get().resources.openRawResource(R.raw.esp)
-			certInput.use { input ->
-				val cert = cf.generateCertificate(input) as X509Certificate
-				CertificatePinner.pin(cert)
-			}
-		} catch (_: Throwable) {
-			null
-		}
-	}
-
 	private fun trustedClient(builder: OkHttpClient.Builder): OkHttpClient.Builder {
 		return try {
-			val cf = CertificateFactory.getInstance("X.509")
-			// Raw resource name is the filename without extension: esp.crt -> R.raw.esp
-			val certInput = com.elevox.app.AppContext.get().resources.openRawResource(R.raw.esp)
-			certInput.use { input ->
-				val cert = cf.generateCertificate(input) as X509Certificate
-				val certificates = HandshakeCertificates.Builder()
-					.addTrustedCertificate(cert)
-					.build()
-				builder.sslSocketFactory(certificates.sslSocketFactory(), certificates.trustManager)
-			}
-			builder
+			val trusted = PinTable.certificates
+			if (trusted.isEmpty()) return builder // fallback: use default trust if raw not present
+			val certificates = HandshakeCertificates.Builder()
+				.apply { trusted.forEach { addTrustedCertificate(it) } }
+				.build()
+			builder.sslSocketFactory(certificates.sslSocketFactory(), certificates.trustManager)
 		} catch (t: Throwable) {
 			builder // fallback: use default trust if raw not present
 		}
 	}
 
+	// Checks the leaf certificate against the SPKI pin table (one HashSet lookup)
+	private val pinInterceptor = Interceptor { chain ->
+		val leaf = chain.connection()?.handshake()?.peerCertificates?.firstOrNull()
+		if (leaf != null && !PinTable.matches(leaf)) {
+			throw SSLPeerUnverifiedException("Certificate pinning failure for ${chain.request().url.host}")
+		}
+		chain.proceed(chain.request())
+	}
+
 	private val client: OkHttpClient by lazy {
 		var builder = OkHttpClient.Builder()
 			.connectTimeout(8, TimeUnit.SECONDS)
 			.readTimeout(15, TimeUnit.SECONDS)
 			.writeTimeout(15, TimeUnit.SECONDS)
 
-		computePinFromRaw()?.let { pin ->
-			val pinner = CertificatePinner.Builder()
-				.add(BuildConfig.ESP32_HOST, pin)
-				.build()
-			builder = builder.certificatePinner(pinner)
+		if (PinTable.pins.isNotEmpty()) {
+			builder = builder.addNetworkInterceptor(pinInterceptor)
 		}
 
 		if (BuildConfig.DEBUG) {
@@ -0,0 +1,66 @@
+package com.elevox.app.net
+
+import com.elevox.app.AppContext
+import com.elevox.app.R
+import okhttp3.CertificatePinner
+import java.security.cert.Certificate
+import java.security.cert.CertificateFactory
+import java.security.cert.X509Certificate
+
+/**
+ * Trusted device certificates and their SPKI SHA-256 pins.
+ *
+ * Both are generated by scripts/copiar_cert_para_app.py:
+ * - res/raw/esp.crt: deduplicated PEM bundle with every device certificate
+ * - res/raw/esp_pins.txt: one "sha256/..." pin per line ('#' starts a comment)
+ *
+ * Everything is loaded once; pin lookup is a HashSet hit.
+ */
+object PinTable {
+	val certificates: List<X509Certificate> by lazy { loadCertificates() }
+
+	val pins: Set<String> by lazy { loadPins() }
+
+	@Volatile
+	private var lastVerified: Certificate? = null
+
+	fun matches(cert: Certificate): Boolean {
+		// Same connection (and therefore same peer cert object) is reused across polls
+		if (cert === lastVerified) return true
+		val ok = cert is X509Certificate && CertificatePinner.pin(cert) in pins
+		if (ok) lastVerified = cert
+		return ok
+	}
+
+	private fun loadCertificates(): List<X509Certificate> {
+		return try {
+			val cf = CertificateFactory.getInstance("X.509")
+			// Raw resource name is the filename without extension: esp.crt -> R.raw.esp
+			AppContext.get().resources.openRawResource(R.raw.esp).use { input ->
+				cf.generateCertificates(input).filterIsInstance<X509Certificate>()
+			}
+		} catch (_: Throwable) {
+			emptyList()
+		}
+	}
+
+	private fun loadPins(): Set<String> {
+		val context = AppContext.get()
+		// esp_pins.txt is optional: older setups only ship esp.crt
+		val id = context.resources.getIdentifier("esp_pins", "raw", context.packageName)
+		if (id != 0) {
+			try {
+				val table = context.resources.openRawResource(id).bufferedReader().use { reader ->
+					reader.lineSequence()
+						.map { it.substringBefore('#').trim() }
+						.filter { it.startsWith("sha256/") }
+						.toHashSet()
+				}
+				if (table.isNotEmpty()) return table
+			} catch (_: Throwable) {
+				// fall through to the bundle
+			}
+		}
+		return certificates.mapTo(HashSet()) { CertificatePinner.pin(it) }
+	}
+}
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Compara polling, long-poll e SSE de /status no servidor de referência
+Mede requisições, CPU do servidor e latência de atualização para N clientes
+"""
+
+import http.client
+import json
+import os
+import random
+import socket
+import ssl
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import timings
+
+MODES = ('poll', 'longpoll', 'sse')
+DEFAULT_CLIENTS = (1, 10, 50, 100, 500)
+
+# Mesmo intervalo do HomeViewModel.startPolling()
+POLL_INTERVAL = 2.0
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'servidor_referencia.py')
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Endpoint:
+    """Endereço do servidor e fábrica de conexões (HTTP ou HTTPS)"""
+
+    def __init__(self, port, tls=False):
+        self.port = port
+        self.tls = tls
+        if tls:
+            # Certificado auto-assinado do ESP32: sem verificação no benchmark
+            self._context = ssl.create_default_context()
+            self._context.check_hostname = False
+            self._context.verify_mode = ssl.CERT_NONE
+
+    def connect(self, timeout=70):
+        if self.tls:
+            return http.client.HTTPSConnection('127.0.0.1', self.port,
+                                               timeout=timeout, context=self._context)
+        return http.client.HTTPConnection('127.0.0.1', self.port, timeout=timeout)
+
+    def request(self, method, path, body=None):
+        conn = self.connect()
+        try:
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, resp.read()
+        finally:
+            conn.close()
+
+    def metrics(self):
+        _, body = self.request('GET', '/metrics')
+        return json.loads(body)
+
+
+def start_server(tls):
+    """Sobe o servidor de referência num processo separado"""
+    port = _free_port()
+    cmd = [sys.executable, SERVER_SCRIPT, '--host', '127.0.0.1', '--port', str(port)]
+    if tls:
+        cmd.append('--tls')
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    endpoint = Endpoint(port, tls)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Servidor encerrou: {proc.stdout.read().decode(errors='replace')}")
+        try:
+            endpoint.request('GET', '/')
+            return proc, endpoint
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("Servidor de referência não respondeu")
+
+
+class Client(threading.Thread):
+    """
+    Um app consultando /status.
+    Guarda o instante em que viu cada versão pela primeira vez.
+    """
+
+    def __init__(self, endpoint, mode, stop, poll_interval):
+        super().__init__(daemon=True)
+        self.endpoint = endpoint
+        self.mode = mode
+        self.stop = stop
+        self.poll_interval = poll_interval
+        self.seen = {}
+        self.errors = 0
+        self.conn = None
+
+    def _see(self, version):
+        if version not in self.seen:
+            self.seen[version] = time.monotonic()
+
+    def run(self):
+        try:
+            getattr(self, '_run_' + self.mode)()
+        except (OSError, http.client.HTTPException, ValueError):
+            if not self.stop.is_set():
+                self.errors += 1
+
+    def _run_poll(self):
+        self.conn = self.endpoint.connect()
+        # Apps independentes não consultam todos no mesmo instante
+        if self.stop.wait(random.uniform(0, self.poll_interval)):
+            return
+        while not self.stop.is_set():
+            self.conn.request('GET', '/status')
+            resp = self.conn.getresponse()
+            resp.read()
+            self._see(int(resp.getheader('X-Status-Version')))
+            self.stop.wait(self.poll_interval)
+
+    def _run_longpoll(self):
+        self.conn = self.endpoint.connect()
+        self.conn.request('GET', '/status')
+        resp = self.conn.getresponse()
+        resp.read()
+        since = int(resp.getheader('X-Status-Version'))
+        self._see(since)
+        while not self.stop.is_set():
+            self.conn.request('GET', f'/status?since={since}')
+            resp = self.conn.getresponse()
+            resp.read()
+            since = int(resp.getheader('X-Status-Version'))
+            if resp.status == 200:
+                self._see(since)
+
+    def _run_sse(self):
+        self.conn = self.endpoint.connect()
+        self.conn.request('GET', '/status/stream')
+        resp = self.conn.getresponse()
+        while not self.stop.is_set():
+            line = resp.fp.readline()
+            if not line:
+                break
+            if line.startswith(b'id: '):
+                self._see(int(line[4:]))
+
+    def close(self):
+        if self.conn is not None and self.conn.sock is not None:
+            try:
+                self.conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def run_scenario(mode, clients, duration, change_interval, poll_interval, tls):
+    """Executa um cenário e retorna as métricas em um dict"""
+    proc, endpoint = start_server(tls)
+    try:
+        stop = threading.Event()
+        workers = [Client(endpoint, mode, stop, poll_interval) for _ in range(clients)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.5)  # conexões abertas antes de medir
+
+        before = endpoint.metrics()
+        injected = {}
+        started = time.monotonic()
+        floor = 0
+        next_change = started + change_interval / 2
+        while True:
+            now = time.monotonic()
+            if now - started >= duration:
+                break
+            if now >= next_change:
+                floor = (floor + 1) % 4
+                t0 = time.monotonic()
+                _, body = endpoint.request(
+                    'POST', '/simulacao/arduino',
+                    json.dumps({'currentFloor': floor, 'status': 'arrived'}).encode('utf-8'))
+                injected[json.loads(body)['version']] = t0
+                next_change += change_interval
+            time.sleep(min(0.05, max(0.0, next_change - time.monotonic())))
+
+        # Espera as últimas atualizações chegarem antes de medir
+        time.sleep(poll_interval if mode == 'poll' else 0.5)
+        after = endpoint.metrics()
+        elapsed = time.monotonic() - started
+
+        stop.set()
+        for worker in workers:
+            worker.close()
+        for worker in workers:
+            worker.join(timeout=5)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    latencies = []
+    delivered = 0
+    for worker in workers:
+        for version, t0 in injected.items():
+            seen = worker.seen.get(version)
+            if seen is not None:
+                delivered += 1
+                latencies.append(seen - t0)
+
+    status_routes = ('/status', '/status?since', '/status/stream')
+    requests = sum(after['requests'].get(r, 0) - before['requests'].get(r, 0)
+                   for r in status_routes)
+    cpu = after['process_cpu_s'] - before['process_cpu_s']
+    expected = len(injected) * clients
+
+    return {
+        'mode': mode,
+        'clients': clients,
+        'duration_s': round(elapsed, 3),
+        'changes': len(injected),
+        'status_requests': requests,
+        'requests_per_s': round(requests / elapsed, 2),
+        'server_cpu_s': round(cpu, 4),
+        'server_bytes_sent': after['bytes_sent'] - before['bytes_sent'],
+        'server_events_sent': after['events_sent'] - before['events_sent'],
+        'updates_expected': expected,
+        'updates_delivered': delivered,
+        'latency_mean_ms': round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+        'latency_p50_ms': round(_percentile(latencies, 50) * 1000, 1) if latencies else None,
+        'latency_p95_ms': round(_percentile(latencies, 95) * 1000, 1) if latencies else None,
+        'latency_max_ms': round(max(latencies) * 1000, 1) if latencies else None,
+        'client_errors': sum(w.errors for w in workers),
+    }
+
+
+def _fmt(value):
+    return '-' if value is None else str(value)
+
+
+def main(clients=DEFAULT_CLIENTS, modes=MODES, duration=10.0, change_interval=3.0,
+         poll_interval=POLL_INTERVAL, tls=False, json_output=None):
+    print("=" * 78)
+    print("📊 Benchmark de /status: polling x long-poll x SSE")
+    print("=" * 78)
+    print(f"\n⚙️  Duração {duration}s por cenário, mudança de andar a cada {change_interval}s, "
+          f"polling a cada {poll_interval}s{', HTTPS' if tls else ''}")
+
+    results = []
+    print(f"\n   {'modo':<9}{'clientes':>9}{'req':>8}{'req/s':>9}{'CPU (s)':>9}"
+          f"{'entregues':>12}{'lat p50':>9}{'lat p95':>9}{'erros':>7}")
+    for n in clients:
+        for mode in modes:
+            with timings.span(f'{mode}_{n}'):
+                r = run_scenario(mode, n, duration, change_interval, poll_interval, tls)
+            results.append(r)
+            print(f"   {mode:<9}{n:>9}{r['status_requests']:>8}{r['requests_per_s']:>9}"
+                  f"{r['server_cpu_s']:>9}"
+                  f"{str(r['updates_delivered']) + '/' + str(r['updates_expected']):>12}"
+                  f"{_fmt(r['latency_p50_ms']):>9}{_fmt(r['latency_p95_ms']):>9}"
+                  f"{r['client_errors']:>7}", flush=True)
+
+    print("\n   Latência em ms, da mudança de posição até o cliente receber a versão nova.")
+
+    if json_output:
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'benchmark': 'status_streaming',
+                'config': {
+                    'duration_s': duration,
+                    'change_interval_s': change_interval,
+                    'poll_interval_s': poll_interval,
+                    'tls': tls,
+                },
+                'results': results,
+            }, f, indent=2)
+        print(f"\n💾 Resultados salvos em: {json_output}")
+
+    return 1 if any(r['client_errors'] for r in results) else 0
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--clients', default=','.join(map(str, DEFAULT_CLIENTS)),
+        help="quantidades de clientes separadas por vírgula (padrão: 1,10,50,100,500)")
+    parser.add_argument(
+        '--modes', default=','.join(MODES),
+        help="estratégias a comparar (padrão: poll,longpoll,sse)")
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help="segundos por cenário (padrão: 10)")
+    parser.add_argument('--change-interval', type=float, default=3.0,
+                        help="segundos entre mudanças de andar (padrão: 3)")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                        help="intervalo do polling em segundos (padrão: 2, como o app)")
+    parser.add_argument('--tls', action='store_true',
+                        help="usa HTTPS com os certificados da pasta data/")
+    parser.add_argument('--json', metavar='ARQUIVO', help="salva os resultados em JSON")
+
+
+if __name__ == '__main__':
+    args = timings.parse_args(__doc__.strip().splitlines()[0], setup=add_arguments)
+    modes = [m for m in args.modes.split(',') if m]
+    invalid = [m for m in modes if m not in MODES]
+    if invalid:
+        print(f"❌ Modo inválido: {', '.join(invalid)} (use {', '.join(MODES)})")
+        sys.exit(1)
+    try:
+        sys.exit(timings.run(
+            lambda: main([int(n) for n in args.clients.split(',') if n], modes,
+                         args.duration, args.change_interval, args.poll_interval,
+                         args.tls, args.json),
+            args))
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrompido pelo usuário")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
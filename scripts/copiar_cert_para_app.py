@@ -1,101 +1,330 @@
 #!/usr/bin/env python3
 """
-Script para copiar o certificado do ESP32 para o app Android
+Script para copiar o(s) certificado(s) do ESP32 para o app Android
+Gera um bundle deduplicado (esp.crt) e a tabela de pins SPKI (esp_pins.txt)
 """
 
+import base64
+import binascii
+import hashlib
 import os
+import re
 import sys
 
-def main():
+import timings
+
+PEM_RE = re.compile(
+    r'-----BEGIN CERTIFICATE-----\s*(.*?)\s*-----END CERTIFICATE-----',
+    re.DOTALL,
+)
+
+CERT_EXTENSIONS = ('.crt', '.pem')
+
+
+def normalize_pem(text):
+    """
+    Normaliza texto PEM:
+    - Remove BOM UTF-8
+    - Converte CRLF/CR para LF
+    - Remove espaços no final das linhas e linhas vazias no final
+    """
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [line.rstrip() for line in text.split('\n')]
+    while lines and lines[-1] == '':
+        lines.pop()
+    return '\n'.join(lines) + '\n'
+
+
+def parse_pem_certificates(text):
+    """Extrai os certificados (DER) de um texto PEM com um ou mais blocos"""
+    certs = []
+    for match in PEM_RE.finditer(text):
+        body = ''.join(match.group(1).split())
+        try:
+            certs.append(base64.b64decode(body, validate=True))
+        except binascii.Error:
+            raise ValueError("Bloco PEM com base64 inválido")
+    return certs
+
+
+def der_to_pem(der):
+    """Converte DER para PEM com linhas de 64 caracteres"""
+    b64 = base64.b64encode(der).decode('ascii')
+    lines = [b64[i:i + 64] for i in range(0, len(b64), 64)]
+    return ('-----BEGIN CERTIFICATE-----\n' + '\n'.join(lines) +
+            '\n-----END CERTIFICATE-----\n')
+
+
+def _der_element(data, pos):
+    """Lê um elemento DER em `pos`; retorna (tag, início do conteúdo, fim)"""
+    if pos + 2 > len(data):
+        raise ValueError("Estrutura DER truncada")
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        n = length & 0x7F
+        if pos + n > len(data):
+            raise ValueError("Estrutura DER truncada")
+        length = int.from_bytes(data[pos:pos + n], 'big')
+        pos += n
+    end = pos + length
+    if end > len(data):
+        raise ValueError("Estrutura DER truncada")
+    return tag, pos, end
+
+
+def spki_der(cert_der):
+    """Retorna o SubjectPublicKeyInfo (DER) de um certificado X.509"""
+    tag, start, _ = _der_element(cert_der, 0)
+    if tag != 0x30:
+        raise ValueError("Certificado DER inválido")
+    tag, pos, _ = _der_element(cert_der, start)  # tbsCertificate
+    if tag != 0x30:
+        raise ValueError("tbsCertificate inválido")
+
+    # version [0] é opcional
+    tag, _, end = _der_element(cert_der, pos)
+    if tag == 0xA0:
+        pos = end
+
+    # serialNumber, signature, issuer, validity, subject
+    for _ in range(5):
+        _, _, pos = _der_element(cert_der, pos)
+
+    tag, _, end = _der_element(cert_der, pos)
+    if tag != 0x30:
+        raise ValueError("SubjectPublicKeyInfo inválido")
+    return cert_der[pos:end]
+
+
+def spki_pin(cert_der):
+    """Pin no formato do OkHttp: sha256/<base64 do SHA-256 do SPKI>"""
+    digest = hashlib.sha256(spki_der(cert_der)).digest()
+    return 'sha256/' + base64.b64encode(digest).decode('ascii')
+
+
+def find_cert_files(paths):
+    """
+    Expande pastas em arquivos .crt/.pem (recursivo), em ordem estável.
+    Retorna pares (caminho, rótulo); o rótulo é relativo à pasta acima da
+    informada (ex.: 'dispositivos/x/server.crt') e vai na tabela de pins,
+    que é empacotada no APK - caminhos absolutos não devem vazar.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            base = os.path.dirname(os.path.abspath(path))
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.endswith(CERT_EXTENSIONS):
+                        full = os.path.join(root, name)
+                        files.append((full, os.path.relpath(os.path.abspath(full), base)))
+        else:
+            # Arquivo avulso: pasta do dispositivo + nome do arquivo
+            parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+            files.append((path, os.path.join(parent, os.path.basename(path))))
+    return [(full, label.replace(os.sep, '/')) for full, label in files]
+
+
+def read_cert_file(path):
+    """
+    Lê um certificado PEM ou DER; retorna o texto PEM.
+    DER (binário, como o gerado por `openssl x509 -outform der`) começa
+    com uma SEQUENCE (0x30) e é convertido para PEM.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:1] == b'\x30':
+        return der_to_pem(data)
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        raise ValueError("Arquivo não é um certificado PEM nem DER")
+
+
+def build_bundle(sources):
+    """
+    Recebe pares (origem, texto PEM) e retorna (bundle PEM, pins).
+    Certificados repetidos (mesmo SHA-256 do DER) entram uma única vez;
+    pins repetidos (mesma chave pública) também.
+    `pins` é um dict pin -> primeira origem onde apareceu.
+    """
+    certs = {}
+    pins = {}
+    for source, text in sources:
+        with timings.span('normalize', len(text)):
+            text = normalize_pem(text)
+            try:
+                ders = parse_pem_certificates(text)
+            except ValueError as e:
+                raise ValueError(f"{e} em: {source}")
+        if not ders:
+            raise ValueError(f"Nenhum certificado PEM em: {source}")
+        for der in ders:
+            fingerprint = hashlib.sha256(der).digest()
+            if fingerprint in certs:
+                continue
+            certs[fingerprint] = der
+            with timings.span('spki_pin', len(der)):
+                try:
+                    pin = spki_pin(der)
+                except ValueError as e:
+                    raise ValueError(f"{e} em: {source}")
+            pins.setdefault(pin, source)
+
+    # Ordena por fingerprint para que a saída não dependa da ordem de entrada
+    bundle = ''.join(der_to_pem(certs[fp]) for fp in sorted(certs))
+    return bundle, pins
+
+
+def format_pin_table(pins, labels=None):
+    """
+    Tabela de pins: um por linha, comentários iniciados por '#'.
+    `labels` troca a origem de cada pin pelo rótulo a ser gravado
+    """
+    labels = labels or {}
+    lines = [
+        "# Gerado por scripts/copiar_cert_para_app.py - não edite",
+        f"# {len(pins)} pin(s) SPKI SHA-256",
+    ]
+    for pin in sorted(pins):
+        lines.append(f"{pin} # {labels.get(pins[pin], pins[pin])}")
+    return '\n'.join(lines) + '\n'
+
+
+def read_pasted_certificate():
+    """Lê um certificado colado no terminal; retorna o texto ou None"""
+    print("\n📋 INSTRUÇÕES:")
+    print("1. No Monitor Serial do ESP32, digite: cat server.crt")
+    print("2. Copie TODA a saída (desde -----BEGIN até -----END)")
+    print("3. Cole abaixo quando solicitado\n")
+
+    print("=" * 70)
+    print("Cole o certificado abaixo e pressione ENTER duas vezes:")
+    print("=" * 70)
+
+    lines = []
+    print()
+    while True:
+        try:
+            line = input()
+            if line.strip() == "" and len(lines) > 0:
+                break
+            if line.strip() != "":
+                lines.append(line)
+        except EOFError:
+            break
+
+    if len(lines) == 0:
+        print("\n❌ Nenhum certificado foi colado!")
+        return None
+
+    cert_content = '\n'.join(lines) + '\n'
+
+    # Valida que parece um certificado PEM
+    if not cert_content.strip().startswith('-----BEGIN CERTIFICATE-----'):
+        print("\n❌ Isso não parece ser um certificado PEM válido!")
+        print("   Deve começar com: -----BEGIN CERTIFICATE-----")
+        return None
+
+    if not '-----END CERTIFICATE-----' in cert_content:
+        print("\n❌ Certificado incompleto!")
+        print("   Deve terminar com: -----END CERTIFICATE-----")
+        return None
+
+    return cert_content
+
+def main(cert_paths=None):
     print("=" * 70)
     print("📱 Copiar Certificado do ESP32 para o App Android")
     print("=" * 70)
-    
+
     # Caminhos
     server_cert = "elevox-server/https_server/data/server.crt"
     app_cert = "elevox-app/app/src/main/res/raw/esp.crt"
-    
+    app_pins = "elevox-app/app/src/main/res/raw/esp_pins.txt"
+
     print("\n🔍 Verificando arquivos...")
-    
-    # Verifica se o certificado do servidor existe
-    if not os.path.exists(server_cert):
-        print(f"\n❌ Certificado do servidor não encontrado em: {server_cert}")
-        print("\n📋 INSTRUÇÕES:")
-        print("1. No Monitor Serial do ESP32, digite: cat server.crt")
-        print("2. Copie TODA a saída (desde -----BEGIN até -----END)")
-        print("3. Cole abaixo quando solicitado\n")
-        
-        print("=" * 70)
-        print("Cole o certificado abaixo e pressione ENTER duas vezes:")
-        print("=" * 70)
-        
-        lines = []
-        print()
-        while True:
-            try:
-                line = input()
-                if line.strip() == "" and len(lines) > 0:
-                    break
-                if line.strip() != "":
-                    lines.append(line)
-            except EOFError:
-                break
-        
-        if len(lines) == 0:
-            print("\n❌ Nenhum certificado foi colado!")
+
+    sources = []
+    labels = {}
+    if cert_paths:
+        # Vários dispositivos: arquivos e/ou pastas com certificados
+        labels = dict(find_cert_files(cert_paths))
+        files = list(labels)
+        missing = [path for path in files if not os.path.isfile(path)]
+        if missing:
+            for path in missing:
+                print(f"\n❌ Certificado não encontrado em: {path}")
             return 1
-        
-        cert_content = '\n'.join(lines) + '\n'
-        
-        # Valida que parece um certificado PEM
-        if not cert_content.strip().startswith('-----BEGIN CERTIFICATE-----'):
-            print("\n❌ Isso não parece ser um certificado PEM válido!")
-            print("   Deve começar com: -----BEGIN CERTIFICATE-----")
+        if not files:
+            print("\n❌ Nenhum arquivo .crt/.pem encontrado!")
             return 1
-        
-        if not '-----END CERTIFICATE-----' in cert_content:
-            print("\n❌ Certificado incompleto!")
-            print("   Deve terminar com: -----END CERTIFICATE-----")
+        for path in files:
+            with timings.span('read') as span:
+                try:
+                    sources.append((path, read_cert_file(path)))
+                except ValueError as e:
+                    print(f"\n❌ {e} em: {path}")
+                    return 1
+                except OSError as e:
+                    print(f"\n❌ {e.strerror or e} em: {path}")
+                    return 1
+                span.add_bytes(len(sources[-1][1]))
+        print(f"✅ {len(files)} arquivo(s) de certificado encontrados")
+    elif not os.path.exists(server_cert):
+        # Verifica se o certificado do servidor existe
+        print(f"\n❌ Certificado do servidor não encontrado em: {server_cert}")
+        cert_content = read_pasted_certificate()
+        if cert_content is None:
             return 1
-        
+        sources.append(('colado', cert_content))
     else:
         # Lê do arquivo local
         print(f"✅ Certificado do servidor encontrado: {server_cert}")
-        with open(server_cert, 'r', encoding='utf-8') as f:
-            cert_content = f.read()
-    
+        with timings.span('read') as span:
+            with open(server_cert, 'r', encoding='utf-8') as f:
+                cert_content = f.read()
+            span.add_bytes(len(cert_content))
+        sources.append((server_cert, cert_content))
+
     # Cria diretórios se necessário
     app_cert_dir = os.path.dirname(app_cert)
     if not os.path.exists(app_cert_dir):
         os.makedirs(app_cert_dir)
         print(f"✅ Pasta criada: {app_cert_dir}")
-    
-    # Corrige formato
-    print("\n🔧 Corrigindo formato...")
-    
-    # Remove BOM se existir
-    if cert_content.startswith('\ufeff'):
-        cert_content = cert_content[1:]
-        print("   Removido BOM UTF-8")
-    
-    # Normaliza line endings para LF
-    cert_content = cert_content.replace('\r\n', '\n').replace('\r', '\n')
-    
-    # Remove linhas vazias extras
-    lines = [line.rstrip() for line in cert_content.split('\n')]
-    while lines and lines[-1] == '':
-        lines.pop()
-    
-    cert_content = '\n'.join(lines) + '\n'
-    
+
+    # Corrige formato, deduplica e calcula os pins
+    print("\n🔧 Corrigindo formato e calculando pins SPKI...")
+    try:
+        cert_content, pins = build_bundle(sources)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+
+    total_certs = cert_content.count('-----BEGIN CERTIFICATE-----')
+    pin_table = format_pin_table(pins, labels)
+
     # Salva no app
-    with open(app_cert, 'wb') as f:
-        f.write(cert_content.encode('utf-8'))
-    
-    print(f"✅ Certificado salvo em: {app_cert}")
+    with timings.span('write') as span:
+        data = cert_content.encode('utf-8')
+        with open(app_cert, 'wb') as f:
+            f.write(data)
+        table = pin_table.encode('utf-8')
+        with open(app_pins, 'wb') as f:
+            f.write(table)
+        span.add_bytes(len(data) + len(table))
+
+    print(f"✅ Certificado(s) salvo(s) em: {app_cert}")
     print(f"   Tamanho: {len(cert_content)} bytes")
-    print(f"   Linhas: {len(lines)}")
-    
+    print(f"   Certificados únicos: {total_certs}")
+    print(f"✅ Tabela de pins salva em: {app_pins}")
+    print(f"   Pins únicos: {len(pins)}")
+
     # Verifica formato
     print("\n📊 Validação:")
     if cert_content.startswith('-----BEGIN CERTIFICATE-----'):
@@ -103,41 +332,52 @@ def main():
     else:
         print("   ❌ ERRO: Não começa com -----BEGIN CERTIFICATE-----")
         return 1
-    
+
     if '-----END CERTIFICATE-----' in cert_content:
         print("   ✅ Fim correto: -----END CERTIFICATE-----")
     else:
         print("   ❌ ERRO: Não termina com -----END CERTIFICATE-----")
         return 1
-    
+
     # Conta terminadores de linha
     crlf = cert_content.count('\r\n')
     lf = cert_content.count('\n') - crlf
     cr = cert_content.count('\r') - crlf
-    
+
     print(f"   Terminadores: CRLF={crlf}, LF={lf}, CR={cr}")
     if crlf == 0 and cr == 0:
         print("   ✅ Apenas LF (Unix) - correto!")
     else:
         print("   ⚠️  Aviso: Contém CRLF ou CR")
-    
+
+    if len(pins) <= 3:
+        for pin in sorted(pins):
+            print(f"   📌 {pin}")
+
     print("\n" + "=" * 70)
     print("✅ SUCESSO! Certificado copiado para o app")
     print("=" * 70)
-    
+
     print("\n📋 Próximos passos:")
     print("1. Compile o app Android novamente")
     print("2. Instale no dispositivo")
     print("3. Teste a conexão com o ESP32")
-    
-    print("\n💡 Dica: O arquivo esp.crt NÃO deve ser commitado no Git")
-    print("   (já está no .gitignore)")
-    
+
+    print("\n💡 Dica: Os arquivos esp.crt e esp_pins.txt NÃO devem ser commitados no Git")
+    print("   (já estão no .gitignore)")
+
     return 0
 
+def add_arguments(parser):
+    parser.add_argument(
+        'certs', nargs='*', metavar='CERT',
+        help="arquivos .crt/.pem ou pastas com os certificados dos "
+             "dispositivos (padrão: elevox-server/https_server/data/server.crt)")
+
 if __name__ == '__main__':
+    args = timings.parse_args(__doc__.strip().splitlines()[0], setup=add_arguments)
     try:
-        sys.exit(main())
+        sys.exit(timings.run(lambda: main(args.certs), args))
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrompido pelo usuário")
         sys.exit(1)
@@ -146,4 +386,3 @@ if __name__ == '__main__':
         import traceback
         traceback.print_exc()
         sys.exit(1)
-
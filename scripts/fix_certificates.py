@@ -7,6 +7,8 @@ Remove BOM, normaliza terminadores de linha e valida formato PEM
 import os
 import sys
 
+import timings
+
 def fix_certificate_file(input_path, output_path=None):
     """
     Corrige um arquivo de certificado/chave:
@@ -23,39 +25,42 @@ def fix_certificate_file(input_path, output_path=None):
     print(f"\n🔧 Processando: {input_path}")
     
     # Lê o arquivo em modo binário
-    with open(input_path, 'rb') as f:
-        content = f.read()
+    with timings.span('read') as span:
+        with open(input_path, 'rb') as f:
+            content = f.read()
+        span.add_bytes(len(content))
     
     # Informações originais
     original_size = len(content)
     print(f"   Tamanho original: {original_size} bytes")
     
-    # Verifica e remove BOM UTF-8
-    if content.startswith(b'\xef\xbb\xbf'):
-        print("   ⚠️  Removendo BOM UTF-8...")
-        content = content[3:]
-    
-    # Converte para string
-    try:
-        text = content.decode('utf-8')
-    except UnicodeDecodeError:
-        print("   ❌ Erro: Arquivo não está em UTF-8!")
-        return False
-    
-    # Normaliza terminadores de linha (CRLF -> LF)
-    original_lines = text.count('\r\n') + text.count('\r') + text.count('\n')
-    text = text.replace('\r\n', '\n').replace('\r', '\n')
-    
-    # Remove espaços no final de cada linha
-    lines = text.split('\n')
-    lines = [line.rstrip() for line in lines]
-    
-    # Remove linhas vazias extras no final
-    while lines and lines[-1] == '':
-        lines.pop()
-    
-    # Garante quebra de linha no final
-    text = '\n'.join(lines) + '\n'
+    with timings.span('normalize', original_size):
+        # Verifica e remove BOM UTF-8
+        if content.startswith(b'\xef\xbb\xbf'):
+            print("   ⚠️  Removendo BOM UTF-8...")
+            content = content[3:]
+        
+        # Converte para string
+        try:
+            text = content.decode('utf-8')
+        except UnicodeDecodeError:
+            print("   ❌ Erro: Arquivo não está em UTF-8!")
+            return False
+        
+        # Normaliza terminadores de linha (CRLF -> LF)
+        original_lines = text.count('\r\n') + text.count('\r') + text.count('\n')
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        # Remove espaços no final de cada linha
+        lines = text.split('\n')
+        lines = [line.rstrip() for line in lines]
+        
+        # Remove linhas vazias extras no final
+        while lines and lines[-1] == '':
+            lines.pop()
+        
+        # Garante quebra de linha no final
+        text = '\n'.join(lines) + '\n'
     
     print(f"   Linhas processadas: {len(lines)}")
     
@@ -96,8 +101,9 @@ def fix_certificate_file(input_path, output_path=None):
         output_path = input_path
     
     # Salva arquivo corrigido
-    with open(output_path, 'wb') as f:
-        f.write(content_fixed)
+    with timings.span('write', len(content_fixed)):
+        with open(output_path, 'wb') as f:
+            f.write(content_fixed)
     
     new_size = len(content_fixed)
     print(f"   Tamanho final: {new_size} bytes")
@@ -120,8 +126,10 @@ def check_file_details(file_path):
     print(f"\n🔍 Análise detalhada: {file_path}")
     print("=" * 60)
     
-    with open(file_path, 'rb') as f:
-        content = f.read()
+    with timings.span('read') as span:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        span.add_bytes(len(content))
     
     print(f"Tamanho: {len(content)} bytes")
     
@@ -250,7 +258,7 @@ def main():
             print(f"\n✅ {success_count}/{len(files_to_fix)} arquivos processados com sucesso!")
             print("\n📤 Próximos passos:")
             print("1. Use o Arduino IDE: Tools > ESP32 Sketch Data Upload")
-            print("2. Ou use esptool.py para fazer upload manual")
+            print("2. Ou gere a imagem com gerar_imagem_littlefs.py e grave com esptool.py")
             print("3. Compile e envie o código para o ESP32")
         else:
             print("❌ Operação cancelada.")
@@ -266,8 +274,9 @@ def main():
     return 0
 
 if __name__ == '__main__':
+    args = timings.parse_args(__doc__.strip().splitlines()[0])
     try:
-        sys.exit(main())
+        sys.exit(timings.run(main, args))
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrompido pelo usuário")
         sys.exit(1)
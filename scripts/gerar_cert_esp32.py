@@ -7,6 +7,8 @@ import subprocess
 import os
 import sys
 
+import timings
+
 def run_command(cmd, shell=True):
     """Executa comando e retorna resultado"""
     try:
@@ -23,7 +25,8 @@ def generate_certificates():
     print("=" * 60)
     
     # Verifica se OpenSSL está disponível
-    success, stdout, stderr = run_command("openssl version")
+    with timings.span('openssl_version'):
+        success, stdout, stderr = run_command("openssl version")
     if not success:
         print("\n❌ OpenSSL não encontrado!")
         print("Instale o OpenSSL:")
@@ -54,7 +57,8 @@ def generate_certificates():
     
     # Gera chave privada
     cmd = "openssl genrsa -out server.key 2048"
-    success, stdout, stderr = run_command(cmd)
+    with timings.span('genrsa'):
+        success, stdout, stderr = run_command(cmd)
     if not success:
         print(f"❌ Erro ao gerar chave: {stderr}")
         return False
@@ -71,7 +75,8 @@ def generate_certificates():
         '-days 3650 '
         '-subj "/C=BR/ST=State/L=City/O=ESP32/OU=IoT/CN=esp32.local"'
     )
-    success, stdout, stderr = run_command(cmd)
+    with timings.span('req_x509'):
+        success, stdout, stderr = run_command(cmd)
     if not success:
         print(f"❌ Erro ao gerar certificado: {stderr}")
         return False
@@ -82,40 +87,46 @@ def generate_certificates():
     
     # Corrige formato de ambos os arquivos
     for filename in ['server.crt', 'server.key']:
-        with open(filename, 'rb') as f:
-            content = f.read()
-        
-        # Remove BOM se existir
-        if content.startswith(b'\xef\xbb\xbf'):
-            content = content[3:]
-            print(f"   Removido BOM de {filename}")
-        
-        # Converte para texto
-        text = content.decode('utf-8')
-        
-        # Normaliza line endings para LF
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        
-        # Remove espaços no final das linhas
-        lines = [line.rstrip() for line in text.split('\n')]
-        
-        # Remove linhas vazias extras no final
-        while lines and lines[-1] == '':
-            lines.pop()
+        with timings.span('read') as span:
+            with open(filename, 'rb') as f:
+                content = f.read()
+            span.add_bytes(len(content))
         
-        # Reconstrói com LF e garante newline no final
-        text = '\n'.join(lines) + '\n'
+        with timings.span('normalize', len(content)):
+            # Remove BOM se existir
+            if content.startswith(b'\xef\xbb\xbf'):
+                content = content[3:]
+                print(f"   Removido BOM de {filename}")
+            
+            # Converte para texto
+            text = content.decode('utf-8')
+            
+            # Normaliza line endings para LF
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+            
+            # Remove espaços no final das linhas
+            lines = [line.rstrip() for line in text.split('\n')]
+            
+            # Remove linhas vazias extras no final
+            while lines and lines[-1] == '':
+                lines.pop()
+            
+            # Reconstrói com LF e garante newline no final
+            text = '\n'.join(lines) + '\n'
+            data = text.encode('utf-8')
         
         # Salva em UTF-8 sem BOM, apenas LF
-        with open(filename, 'wb') as f:
-            f.write(text.encode('utf-8'))
+        with timings.span('write', len(data)):
+            with open(filename, 'wb') as f:
+                f.write(data)
         
         print(f"   ✅ {filename} corrigido ({len(text)} bytes)")
     
     print("\n📊 Validando certificados...")
     
     # Valida certificado
-    success, stdout, stderr = run_command("openssl x509 -in server.crt -text -noout")
+    with timings.span('x509_check'):
+        success, stdout, stderr = run_command("openssl x509 -in server.crt -text -noout")
     if success:
         print("   ✅ Certificado válido")
         # Extrai informações relevantes
@@ -126,7 +137,8 @@ def generate_certificates():
         print(f"   ⚠️  Aviso: {stderr}")
     
     # Valida chave
-    success, stdout, stderr = run_command("openssl rsa -in server.key -check -noout")
+    with timings.span('rsa_check'):
+        success, stdout, stderr = run_command("openssl rsa -in server.key -check -noout")
     if success:
         print("   ✅ Chave privada válida")
     else:
@@ -141,6 +153,7 @@ def generate_certificates():
     print("2. Ou formate o LittleFS no ESP32:")
     print("   - Monitor Serial → digite 'format' → 'SIM'")
     print("3. Faça upload dos arquivos da pasta 'data'")
+    print("   (ou gere uma imagem: python gerar_imagem_littlefs.py)")
     print("4. Reinicie o ESP32")
     
     print("\n📄 Arquivos gerados:")
@@ -151,8 +164,9 @@ def generate_certificates():
     return True
 
 if __name__ == '__main__':
+    args = timings.parse_args(__doc__.strip())
     try:
-        success = generate_certificates()
+        success = timings.run(generate_certificates, args)
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrompido pelo usuário")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Gera imagens LittleFS prontas para gravar no ESP32 com esptool
+Uma imagem por pasta de dispositivo (server.crt, server.key, wifi_config.json)
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import timings
+
+try:
+    import littlefs
+except ImportError:
+    littlefs = None
+
+# Geometria usada pelo LittleFS do arduino-esp32 (mesma do mklittlefs)
+BLOCK_SIZE = 4096
+PAGE_SIZE = 256
+NAME_MAX = 64  # CONFIG_LITTLEFS_OBJ_NAME_LEN
+
+# Partição "spiffs" da tabela padrão do ESP32 com 4MB de flash
+PARTITION_OFFSET = 0x290000
+PARTITION_SIZE = 0x160000
+
+# Formato 2.0: o esp_littlefs do arduino-esp32 2.x não monta imagens 2.1
+DISK_VERSION = 0x00020000
+
+# Arquivos que não vão para a imagem (ex.: backups do gerar_cert_esp32.py)
+IGNORED_SUFFIXES = ('.backup', '.example')
+
+
+def _fs_config(image_size):
+    return dict(
+        block_size=BLOCK_SIZE,
+        block_count=image_size // BLOCK_SIZE,
+        read_size=PAGE_SIZE,
+        prog_size=PAGE_SIZE,
+        cache_size=PAGE_SIZE,
+        lookahead_size=32,
+        name_max=NAME_MAX,
+        disk_version=DISK_VERSION,
+    )
+
+
+def collect_files(data_dir):
+    """
+    Lista os arquivos de uma pasta de dispositivo.
+    Retorna dict caminho na imagem ('/server.crt') -> conteúdo em bytes
+    """
+    files = {}
+    for root, dirs, names in os.walk(data_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(names):
+            if name.startswith('.') or name.endswith(IGNORED_SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, data_dir).replace(os.sep, '/')
+            for part in rel.split('/'):
+                if len(part.encode('utf-8')) > NAME_MAX:
+                    raise ValueError(f"Nome maior que {NAME_MAX} bytes: {rel}")
+            with open(path, 'rb') as f:
+                files['/' + rel] = f.read()
+    return files
+
+
+def build_image(files, image_size=PARTITION_SIZE):
+    """Cria a imagem LittleFS com os arquivos informados; retorna bytes"""
+    fs = littlefs.LittleFS(**_fs_config(image_size))
+    for path, content in files.items():
+        parent = path.rsplit('/', 1)[0]
+        if parent:
+            fs.makedirs(parent, exist_ok=True)
+        with fs.open(path, 'wb') as f:
+            f.write(content)
+    fs.unmount()
+    return bytes(fs.context.buffer)
+
+
+def verify_image(image, files):
+    """
+    Monta uma cópia da imagem e confere se os arquivos batem com a origem.
+    A imagem original não é alterada. Retorna lista de problemas (vazia = ok)
+    """
+    problems = []
+    context = littlefs.UserContext(buffer=bytearray(image))
+    fs = littlefs.LittleFS(context=context, mount=False, **_fs_config(len(image)))
+    try:
+        fs.mount()
+    except littlefs.LittleFSError as e:
+        return [f"Imagem não monta: {e}"]
+
+    found = set()
+    for root, _, names in fs.walk('/'):
+        for name in names:
+            found.add(root.rstrip('/') + '/' + name)
+
+    for path in sorted(set(files) - found):
+        problems.append(f"Arquivo ausente na imagem: {path}")
+    for path in sorted(found - set(files)):
+        problems.append(f"Arquivo inesperado na imagem: {path}")
+    for path in sorted(found & set(files)):
+        with fs.open(path, 'rb') as f:
+            if f.read() != files[path]:
+                problems.append(f"Conteúdo diferente: {path}")
+
+    fs.unmount()
+    return problems
+
+
+def check_device_files(files):
+    """Avisos sobre os arquivos que o firmware espera encontrar"""
+    warnings = []
+    for required in ('/server.crt', '/server.key', '/wifi_config.json'):
+        if required not in files:
+            warnings.append(f"{required[1:]} não encontrado")
+    for path in ('/server.crt', '/server.key'):
+        content = files.get(path, b'')
+        if content.startswith(b'\xef\xbb\xbf') or b'\r' in content:
+            warnings.append(f"{path[1:]} com BOM ou CRLF (rode fix_certificates.py)")
+    if '/wifi_config.json' in files:
+        try:
+            json.loads(files['/wifi_config.json'].decode('utf-8'))
+        except (UnicodeDecodeError, ValueError):
+            warnings.append("wifi_config.json não é um JSON válido")
+    return warnings
+
+
+def process_device(data_dir, output_path, image_size=PARTITION_SIZE):
+    """
+    Gera, verifica e salva a imagem de um dispositivo.
+    Retorna dict com o resultado (executa também em processos auxiliares).
+    Erros viram problemas no resultado: uma pasta ruim não derruba a frota
+    (e LittleFSError nem pode voltar de um processo auxiliar via pickle)
+    """
+    def failed(problem):
+        return {'dir': data_dir, 'ok': False, 'problems': [problem], 'warnings': []}
+
+    try:
+        with timings.span('collect') as span:
+            files = collect_files(data_dir)
+            total = sum(len(c) for c in files.values())
+            span.add_bytes(total)
+        if not files:
+            return failed("Pasta vazia")
+
+        # Superbloco e diretório raiz ocupam um par de blocos de metadados
+        if total > image_size - 2 * BLOCK_SIZE:
+            return failed(f"Arquivos ({total} bytes) não cabem na partição "
+                          f"({image_size} bytes)")
+
+        with timings.span('build_image') as span:
+            image = build_image(files, image_size)
+            span.add_bytes(len(image))
+
+        with timings.span('verify_image', len(image)):
+            problems = verify_image(image, files)
+
+        if not problems:
+            with timings.span('write', len(image)):
+                with open(output_path, 'wb') as f:
+                    f.write(image)
+    except littlefs.LittleFSError as e:
+        if e.code == littlefs.LittleFSError.Error.LFS_ERR_NOSPC:
+            return failed(f"Arquivos não cabem na partição ({image_size} bytes)")
+        return failed(f"Erro do LittleFS: {e}")
+    except (ValueError, OSError) as e:
+        return failed(str(e))
+
+    return {
+        'dir': data_dir,
+        'output': output_path,
+        'ok': not problems,
+        'files': len(files),
+        'problems': problems,
+        'warnings': check_device_files(files),
+    }
+
+
+def main(data_dirs=None, output_dir='littlefs_images', jobs=None,
+         image_size=PARTITION_SIZE, offset=PARTITION_OFFSET):
+    print("=" * 60)
+    print("💾 Gerador de Imagens LittleFS para ESP32")
+    print("=" * 60)
+
+    if littlefs is None:
+        print("\n❌ Módulo littlefs-python não encontrado!")
+        print("Instale com:")
+        print("  pip install littlefs-python")
+        return 1
+
+    if image_size % BLOCK_SIZE:
+        print(f"\n❌ Tamanho da partição deve ser múltiplo de {BLOCK_SIZE} bytes")
+        return 1
+
+    if not data_dirs:
+        data_dirs = [os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')]
+
+    missing = [d for d in data_dirs if not os.path.isdir(d)]
+    if missing:
+        for d in missing:
+            print(f"\n❌ Pasta não encontrada: {d}")
+        return 1
+
+    # Nome da imagem = nome da pasta do dispositivo
+    names = [os.path.basename(os.path.normpath(d)) for d in data_dirs]
+    duplicated = sorted({n for n in names if names.count(n) > 1})
+    if duplicated:
+        print(f"\n❌ Pastas com o mesmo nome: {', '.join(duplicated)}")
+        print("   Cada dispositivo precisa de uma pasta com nome único")
+        return 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = [os.path.join(output_dir, f"{n}.bin") for n in names]
+
+    print(f"\n📐 Geometria: bloco {BLOCK_SIZE} B, página {PAGE_SIZE} B, "
+          f"{image_size // BLOCK_SIZE} blocos ({image_size} bytes)")
+    print(f"🔧 Gerando {len(data_dirs)} imagem(ns)...")
+
+    if len(data_dirs) == 1 or jobs == 1:
+        # Mesmo processo: os tempos por etapa ficam disponíveis em --timings
+        results = [process_device(d, o, image_size) for d, o in zip(data_dirs, outputs)]
+    else:
+        with timings.span('build_fleet'):
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(process_device, data_dirs, outputs,
+                                        [image_size] * len(data_dirs)))
+
+    failures = 0
+    for result in results:
+        if result['ok']:
+            print(f"   ✅ {result['output']} ({result['files']} arquivo(s))")
+        else:
+            failures += 1
+            print(f"   ❌ {result['dir']}")
+            for problem in result['problems']:
+                print(f"      {problem}")
+        for warning in result['warnings']:
+            print(f"      ⚠️  {warning}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"❌ {failures}/{len(results)} imagem(ns) com erro")
+        print("=" * 60)
+        return 1
+    print(f"✅ {len(results)} imagem(ns) gerada(s) e verificada(s)!")
+    print("=" * 60)
+
+    print("\n📋 Próximos passos:")
+    print("1. Conecte o ESP32 e grave a imagem:")
+    print(f"   esptool.py --chip esp32 write_flash {offset:#x} {outputs[0]}")
+    print("2. Reinicie o ESP32")
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        'dirs', nargs='*', metavar='PASTA',
+        help="pastas dos dispositivos (padrão: pasta 'data' ao lado do script)")
+    parser.add_argument(
+        '-o', '--output-dir', default='littlefs_images',
+        help="pasta de saída das imagens .bin (padrão: littlefs_images)")
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help="processos em paralelo (padrão: número de CPUs)")
+    parser.add_argument(
+        '--size', type=lambda v: int(v, 0), default=PARTITION_SIZE,
+        help=f"tamanho da partição LittleFS (padrão: {PARTITION_SIZE:#x})")
+    parser.add_argument(
+        '--offset', type=lambda v: int(v, 0), default=PARTITION_OFFSET,
+        help=f"endereço da partição, usado no comando do esptool (padrão: {PARTITION_OFFSET:#x})")
+
+
+if __name__ == '__main__':
+    args = timings.parse_args(__doc__.strip().splitlines()[0], setup=add_arguments)
+    try:
+        sys.exit(timings.run(
+            lambda: main(args.dirs, args.output_dir, args.jobs, args.size, args.offset),
+            args))
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrompido pelo usuário")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Servidor de referência em Python com as rotas do firmware do ESP32
+Implementa GET /status (polling) e as variantes long-poll e SSE para medir
+o custo de cada estratégia antes de alterar o firmware
+"""
+
+import json
+import os
+import ssl
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import timings
+
+# Mesmos limites do firmware (andares 0 a 3)
+MIN_FLOOR = 0
+MAX_FLOOR = 3
+
+# Long-poll: tempo máximo de espera por uma mudança (segundos)
+LONG_POLL_TIMEOUT = 25.0
+LONG_POLL_MAX_TIMEOUT = 60.0
+
+# SSE: comentário enviado periodicamente para manter a conexão viva
+SSE_KEEPALIVE = 15.0
+
+# TLS: tempo máximo para um cliente concluir o handshake (segundos)
+TLS_HANDSHAKE_TIMEOUT = 10.0
+
+# Simulação do Arduino: tempo para passar de um andar ao próximo
+FLOOR_TRAVEL_SECONDS = 2.0
+
+
+def parse_arduino_message(line):
+    """
+    Interpreta uma linha da serial do Arduino, como lerPosicaoDoArduino():
+    {"currentFloor":X,"status":"arrived"} -> (X, "arrived"); None se inválida
+    """
+    try:
+        doc = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(doc, dict):
+        return None
+    current_floor = doc.get('currentFloor', -1)
+    if type(current_floor) is not int or not MIN_FLOOR <= current_floor <= MAX_FLOOR:
+        return None
+    return current_floor, str(doc.get('status', 'unknown'))
+
+
+class ElevatorState:
+    """
+    Posição do elevador em memória, como em lerPosicaoDoArduino().
+    `version` só muda quando andar ou status mudam; é isso que acorda
+    os clientes em long-poll e SSE.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._started = time.monotonic()
+        self.current_floor = 0
+        self.status = "stopped"
+        self.last_update = 0
+        self.version = 0
+
+    def millis(self):
+        return int((time.monotonic() - self._started) * 1000)
+
+    def update(self, current_floor, status):
+        """Aplica uma mensagem do Arduino; retorna True se algo mudou"""
+        if not MIN_FLOOR <= current_floor <= MAX_FLOOR:
+            return False
+        with self._cond:
+            self.last_update = self.millis()
+            if (current_floor, status) == (self.current_floor, self.status):
+                return False
+            self.current_floor = current_floor
+            self.status = status
+            self.version += 1
+            self._cond.notify_all()
+            return True
+
+    def snapshot(self):
+        """Retorna (versão, corpo JSON) de forma consistente"""
+        with self._cond:
+            return self.version, self._body()
+
+    def wait_change(self, since, timeout):
+        """
+        Espera até a versão ser diferente de `since` ou o tempo acabar.
+        Retorna (versão, corpo JSON) ou None em caso de timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.version != since, timeout):
+                return None
+            return self.version, self._body()
+
+    def _body(self):
+        return json.dumps({
+            'currentFloor': self.current_floor,
+            'status': self.status,
+            'lastUpdate': self.last_update,
+        }, separators=(',', ':')).encode('utf-8')
+
+
+class Metrics:
+    """Contadores expostos em GET /metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.bytes_sent = 0
+        self.events_sent = 0
+        self.open_streams = 0
+
+    def count(self, route, nbytes):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            self.bytes_sent += nbytes
+
+    def event(self, nbytes):
+        with self._lock:
+            self.events_sent += 1
+            self.bytes_sent += nbytes
+
+    def streams(self, delta):
+        with self._lock:
+            self.open_streams += delta
+
+    def report(self):
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'bytes_sent': self.bytes_sent,
+                'events_sent': self.events_sent,
+                'open_streams': self.open_streams,
+                'process_cpu_s': time.process_time(),
+                'threads': threading.active_count(),
+            }
+
+
+class ArduinoSimulator:
+    """Simula o Arduino: recebe o comando de /dados e reporta cada andar"""
+
+    def __init__(self, state, travel_seconds=FLOOR_TRAVEL_SECONDS):
+        self.state = state
+        self.travel_seconds = travel_seconds
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def send(self, target_floor):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(
+                target=self._move, args=(target_floor,), daemon=True)
+            self._thread.start()
+            return True
+
+    def _move(self, target_floor):
+        floor = self.state.current_floor
+        step = 1 if target_floor > floor else -1
+        while floor != target_floor:
+            self.state.update(floor, "moving")
+            time.sleep(self.travel_seconds)
+            floor += step
+        self.state.update(floor, "arrived")
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """Rotas do firmware mais as variantes de streaming de /status"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ElevoxReference/1.0'
+    # Cabeçalho e corpo saem em escritas separadas; sem isso o Nagle
+    # soma ~40 ms a cada resposta e distorce a latência medida
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, route, code, body=b'', content_type='text/plain; charset=utf-8',
+              headers=None):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.metrics.count(route, len(body))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/':
+            self._send('/', 200, "<h1>Servidor HTTPS ativo via LittleFS!</h1>\n".encode('utf-8'),
+                       'text/html; charset=utf-8')
+        elif url.path == '/status' and 'since' in query:
+            self._status_long_poll(query)
+        elif url.path == '/status':
+            version, body = self.server.state.snapshot()
+            self._send('/status', 200, body, 'application/json; charset=utf-8',
+                       {'X-Status-Version': str(version)})
+        elif url.path == '/status/stream':
+            self._status_stream()
+        elif url.path == '/metrics':
+            body = json.dumps(self.server.metrics.report()).encode('utf-8')
+            self._send('/metrics', 200, body, 'application/json')
+        else:
+            self._send(url.path, 404, "Not Found\n".encode('utf-8'))
+
+    def _status_long_poll(self, query):
+        """
+        GET /status?since=<versão>[&timeout=<s>]
+        Responde assim que a versão for diferente de `since`;
+        sem mudança até o timeout, responde 304 sem corpo.
+        """
+        try:
+            since = int(query['since'][0])
+            timeout = float(query.get('timeout', [LONG_POLL_TIMEOUT])[0])
+        except ValueError:
+            self._send('/status?since', 400, "❌ Parâmetros inválidos\n".encode('utf-8'))
+            return
+        timeout = max(0.0, min(timeout, LONG_POLL_MAX_TIMEOUT))
+
+        result = self.server.state.wait_change(since, timeout)
+        try:
+            if result is None:
+                self._send('/status?since', 304, headers={'X-Status-Version': str(since)})
+                return
+            version, body = result
+            self._send('/status?since', 200, body, 'application/json; charset=utf-8',
+                       {'X-Status-Version': str(version)})
+        except (BrokenPipeError, ConnectionResetError, ssl.SSLError):
+            # Cliente desistiu durante a espera; nada a responder
+            self.close_connection = True
+
+    def _status_stream(self):
+        """
+        GET /status/stream (Server-Sent Events)
+        Envia o estado atual e depois um evento a cada mudança de posição.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        self.server.metrics.count('/status/stream', 0)
+        self.server.metrics.streams(+1)
+
+        state = self.server.state
+        version, body = state.snapshot()
+        try:
+            while True:
+                event = b'id: %d\ndata: %s\n\n' % (version, body)
+                self.wfile.write(event)
+                self.wfile.flush()
+                self.server.metrics.event(len(event))
+                result = state.wait_change(version, SSE_KEEPALIVE)
+                while result is None:
+                    self.wfile.write(b': keepalive\n\n')
+                    self.wfile.flush()
+                    result = state.wait_change(version, SSE_KEEPALIVE)
+                version, body = result
+        except (BrokenPipeError, ConnectionResetError, ssl.SSLError):
+            pass
+        finally:
+            self.server.metrics.streams(-1)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length)
+        try:
+            doc = json.loads(raw.decode('utf-8') or '{}')
+        except (UnicodeDecodeError, ValueError):
+            doc = None
+        if not isinstance(doc, dict):
+            self._send(url.path, 400, "❌ JSON inválido\n".encode('utf-8'))
+            return
+
+        if url.path == '/dados':
+            # Mesmas validações do handleDados() do firmware
+            current_floor = doc.get('currentFloor', 0)
+            target_floor = doc.get('targetFloor', 0)
+            if not all(type(f) is int and MIN_FLOOR <= f <= MAX_FLOOR
+                       for f in (current_floor, target_floor)):
+                self._send('/dados', 400, "❌ Andares devem ser entre 0 e 3\n".encode('utf-8'))
+                return
+            self.server.arduino.send(target_floor)
+            self._send('/dados', 200, "✅ Comando enviado ao elevador!\n".encode('utf-8'))
+
+        elif url.path == '/simulacao/arduino':
+            # Injeta diretamente a mensagem que o Arduino enviaria pela serial
+            message = parse_arduino_message(raw)
+            changed = message is not None and self.server.state.update(*message)
+            version, _ = self.server.state.snapshot()
+            body = json.dumps({'changed': changed, 'version': version}).encode('utf-8')
+            self._send('/simulacao/arduino', 200, body, 'application/json')
+
+        else:
+            self._send(url.path, 405, "Use POST para enviar dados.\n".encode('utf-8'))
+
+
+class ReferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, verbose=False, travel_seconds=FLOOR_TRAVEL_SECONDS,
+                 ssl_context=None):
+        super().__init__(address, StatusHandler)
+        self.state = ElevatorState()
+        self.metrics = Metrics()
+        self.arduino = ArduinoSimulator(self.state, travel_seconds)
+        self.verbose = verbose
+        self.ssl_context = ssl_context
+
+    def get_request(self):
+        # O accept() continua em texto puro: o handshake TLS fica para a
+        # thread da conexão, senão um cliente lento travaria todos os outros
+        sock, address = super().get_request()
+        if self.ssl_context is not None:
+            sock = self.ssl_context.wrap_socket(
+                sock, server_side=True, do_handshake_on_connect=False)
+        return sock, address
+
+    def finish_request(self, request, client_address):
+        # Executa na thread da conexão (ThreadingMixIn)
+        if self.ssl_context is not None:
+            try:
+                request.settimeout(TLS_HANDSHAKE_TIMEOUT)
+                request.do_handshake()
+                request.settimeout(None)
+            except (ssl.SSLError, OSError) as e:
+                if self.verbose:
+                    print(f"⚠️  Handshake TLS falhou ({client_address[0]}): {e}", flush=True)
+                return
+        super().finish_request(request, client_address)
+
+
+def main(host='0.0.0.0', port=8443, tls=False, verbose=False,
+         travel_seconds=FLOOR_TRAVEL_SECONDS):
+    context = None
+    scheme = 'http'
+    if tls:
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+        cert = os.path.join(data_dir, 'server.crt')
+        key = os.path.join(data_dir, 'server.key')
+        if not (os.path.exists(cert) and os.path.exists(key)):
+            print(f"❌ Certificados não encontrados em: {data_dir}")
+            print("   Gere com: python gerar_cert_esp32.py")
+            return 1
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        scheme = 'https'
+
+    server = ReferenceServer((host, port), verbose, travel_seconds, context)
+
+    print(f"🚀 Servidor de referência em {scheme}://{host}:{server.server_address[1]}/", flush=True)
+    print("   GET  /status                 polling (como o firmware)")
+    print("   GET  /status?since=N         long-poll")
+    print("   GET  /status/stream          Server-Sent Events")
+    print("   POST /dados                  comando do app (simula o Arduino)")
+    print("   POST /simulacao/arduino      injeta mensagem do Arduino")
+    print("   GET  /metrics                contadores e CPU do servidor", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servidor encerrado")
+    finally:
+        server.server_close()
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8443)
+    parser.add_argument(
+        '--tls', action='store_true',
+        help="usa HTTPS com data/server.crt e data/server.key, como o ESP32")
+    parser.add_argument(
+        '--travel-seconds', type=float, default=FLOOR_TRAVEL_SECONDS,
+        help="tempo simulado entre andares após POST /dados")
+    parser.add_argument('-v', '--verbose', action='store_true', help="loga cada requisição")
+
+
+if __name__ == '__main__':
+    args = timings.parse_args(__doc__.strip().splitlines()[0], setup=add_arguments)
+    try:
+        sys.exit(timings.run(
+            lambda: main(args.host, args.port, args.tls, args.verbose, args.travel_seconds),
+            args))
+    except Exception as e:
+        print(f"\n❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
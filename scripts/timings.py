@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Instrumentação compartilhada pelos scripts de provisionamento
+Mede etapas nomeadas (spans) com tempo de parede, tempo de CPU e bytes
+processados, e opcionalmente gera um perfil cProfile/pstats
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import sys
+import time
+
+
+class _Span:
+    """Registro de uma etapa em andamento"""
+
+    __slots__ = ('recorder', 'name', 'bytes', '_wall', '_cpu', '_child_cpu')
+
+    def __init__(self, recorder, name, nbytes):
+        self.recorder = recorder
+        self.name = name
+        self.bytes = nbytes
+
+    def add_bytes(self, nbytes):
+        """Soma bytes processados nesta etapa"""
+        self.bytes += nbytes
+
+    def __enter__(self):
+        self._child_cpu = _child_cpu_time()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        child_cpu = _child_cpu_time() - self._child_cpu
+        self.recorder._record(self.name, wall, cpu, child_cpu, self.bytes)
+        return False
+
+
+class _NullSpan:
+    """Etapa sem medição, usada quando a instrumentação está desligada"""
+
+    __slots__ = ()
+
+    def add_bytes(self, nbytes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _child_cpu_time():
+    """Tempo de CPU dos processos filhos já finalizados (ex.: openssl, git)"""
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+class Recorder:
+    """
+    Acumula as etapas medidas por nome.
+    Desligado por padrão: span() devolve um objeto nulo compartilhado,
+    sem chamadas de relógio nem alocação.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = {}
+        self._started = None
+
+    def enable(self):
+        self.enabled = True
+        self._started = time.perf_counter()
+
+    def span(self, name, nbytes=0):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, nbytes)
+
+    def _record(self, name, wall, cpu, child_cpu, nbytes):
+        entry = self.spans.get(name)
+        if entry is None:
+            entry = self.spans[name] = {
+                'name': name,
+                'count': 0,
+                'wall_s': 0.0,
+                'cpu_s': 0.0,
+                'child_cpu_s': 0.0,
+                'bytes': 0,
+            }
+        entry['count'] += 1
+        entry['wall_s'] += wall
+        entry['cpu_s'] += cpu
+        entry['child_cpu_s'] += child_cpu
+        entry['bytes'] += nbytes
+
+    def report(self, script):
+        """Retorna o relatório em forma de dicionário serializável"""
+        total = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            'script': script,
+            'total_wall_s': total,
+            'spans': list(self.spans.values()),
+        }
+
+
+# Instância única usada pelos scripts
+recorder = Recorder()
+
+
+def span(name, nbytes=0):
+    """
+    Mede uma etapa nomeada:
+
+        with timings.span('normalize') as s:
+            ...
+            s.add_bytes(len(text))
+    """
+    return recorder.span(name, nbytes)
+
+
+def parse_args(description, argv=None, setup=None):
+    """
+    Interpreta as opções comuns --timings e --profile.
+    `setup(parser)` permite ao script acrescentar suas próprias opções.
+    Caminhos são resolvidos agora, pois alguns scripts mudam de diretório.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    if setup is not None:
+        setup(parser)
+    parser.add_argument(
+        '--timings', choices=['json', 'text'],
+        help="emite o tempo de cada etapa ao final (em stderr)")
+    parser.add_argument(
+        '--profile', metavar='ARQUIVO',
+        help="grava um perfil cProfile/pstats no arquivo indicado")
+    args = parser.parse_args(argv)
+    if args.profile:
+        args.profile = os.path.abspath(args.profile)
+    if args.timings:
+        recorder.enable()
+    return args
+
+
+def run(func, args):
+    """
+    Executa a função principal do script com perfil e relatório de tempos,
+    conforme as opções recebidas. Retorna o valor retornado pela função.
+    """
+    profiler = cProfile.Profile() if args.profile else None
+    try:
+        if profiler is None:
+            return func()
+        return profiler.runcall(func)
+    finally:
+        if profiler is not None:
+            profiler.dump_stats(args.profile)
+            print(f"\n📈 Perfil salvo em: {args.profile}", file=sys.stderr)
+        if args.timings:
+            _emit(args.timings)
+
+
+def _emit(fmt):
+    script = os.path.basename(sys.argv[0])
+    data = recorder.report(script)
+    if fmt == 'json':
+        print(json.dumps(data, indent=2), file=sys.stderr)
+        return
+
+    print(f"\n⏱️  Tempos por etapa ({script}):", file=sys.stderr)
+    print(f"   {'etapa':<16}{'n':>5}{'parede (s)':>12}{'cpu (s)':>10}"
+          f"{'cpu filhos':>12}{'bytes':>10}", file=sys.stderr)
+    for entry in data['spans']:
+        print(f"   {entry['name']:<16}{entry['count']:>5}"
+              f"{entry['wall_s']:>12.4f}{entry['cpu_s']:>10.4f}"
+              f"{entry['child_cpu_s']:>12.4f}{entry['bytes']:>10}",
+              file=sys.stderr)
+    print(f"   Total: {data['total_wall_s']:.4f} s", file=sys.stderr)
@@ -8,6 +8,8 @@ import os
 import sys
 import subprocess
 
+import timings
+
 # Arquivos/padrões sensíveis que NÃO devem ser commitados
 PADROES_SENSIVEIS = [
     # Certificados e chaves
@@ -27,6 +29,7 @@ PADROES_SENSIVEIS = [
     # Arquivos específicos
     ('elevox-app/app/src/main/res/raw/esp.crt', 'Certificado real do dispositivo'),
     ('elevox-server/https_server/data/', 'Dados sensíveis do ESP32'),
+    ('littlefs_images/', 'Imagens LittleFS (contêm chave privada e WiFi)'),
 ]
 
 # Arquivos permitidos (examples)
@@ -67,13 +70,16 @@ def verificar_arquivos_staged():
     print(f"\n{Cores.AZUL}{Cores.BOLD}🔍 Verificando arquivos staged...{Cores.RESET}\n")
     
     # Verifica se é um repositório git
-    sucesso, _, _ = executar_comando("git rev-parse --git-dir")
+    with timings.span('git_rev_parse'):
+        sucesso, _, _ = executar_comando("git rev-parse --git-dir")
     if not sucesso:
         print(f"{Cores.AMARELO}⚠️  Não é um repositório Git{Cores.RESET}")
         return True
     
     # Obtém lista de arquivos staged
-    sucesso, output, _ = executar_comando("git diff --cached --name-only")
+    with timings.span('git_diff_names') as span:
+        sucesso, output, _ = executar_comando("git diff --cached --name-only")
+        span.add_bytes(len(output))
     if not sucesso:
         print(f"{Cores.VERMELHO}❌ Erro ao obter arquivos staged{Cores.RESET}")
         return False
@@ -91,23 +97,24 @@ def verificar_arquivos_staged():
     # Verifica cada arquivo
     problemas = []
     
-    for arquivo in arquivos_staged:
-        # Pula se for arquivo de exemplo
-        if eh_arquivo_exemplo(arquivo):
-            continue
-        
-        # Verifica contra padrões sensíveis
-        for padrao, descricao in PADROES_SENSIVEIS:
-            if padrao.startswith('*'):
-                # Padrão de extensão
-                if arquivo.endswith(padrao[1:]):
-                    problemas.append((arquivo, descricao))
-                    break
-            else:
-                # Padrão de caminho
-                if padrao in arquivo:
-                    problemas.append((arquivo, descricao))
-                    break
+    with timings.span('scan_names'):
+        for arquivo in arquivos_staged:
+            # Pula se for arquivo de exemplo
+            if eh_arquivo_exemplo(arquivo):
+                continue
+            
+            # Verifica contra padrões sensíveis
+            for padrao, descricao in PADROES_SENSIVEIS:
+                if padrao.startswith('*'):
+                    # Padrão de extensão
+                    if arquivo.endswith(padrao[1:]):
+                        problemas.append((arquivo, descricao))
+                        break
+                else:
+                    # Padrão de caminho
+                    if padrao in arquivo:
+                        problemas.append((arquivo, descricao))
+                        break
     
     return problemas
 
@@ -136,13 +143,16 @@ def verificar_conteudo_sensivel(arquivos_staged):
             continue
         
         try:
-            sucesso, output, _ = executar_comando(f'git diff --cached {arquivo}')
+            with timings.span('git_diff') as span:
+                sucesso, output, _ = executar_comando(f'git diff --cached {arquivo}')
+                span.add_bytes(len(output))
             if sucesso:
-                content_lower = output.lower()
-                for padrao in padroes_conteudo:
-                    if padrao.lower() in content_lower:
-                        problemas.append((arquivo, f"Contém '{padrao}'"))
-                        break
+                with timings.span('scan_content', len(output)):
+                    content_lower = output.lower()
+                    for padrao in padroes_conteudo:
+                        if padrao.lower() in content_lower:
+                            problemas.append((arquivo, f"Contém '{padrao}'"))
+                            break
         except:
             pass
     
@@ -163,7 +173,9 @@ def main():
     
     # Verifica conteúdo
     arquivos_staged = []
-    sucesso, output, _ = executar_comando("git diff --cached --name-only")
+    with timings.span('git_diff_names') as span:
+        sucesso, output, _ = executar_comando("git diff --cached --name-only")
+        span.add_bytes(len(output))
     if sucesso:
         arquivos_staged = [f.strip() for f in output.split('\n') if f.strip()]
     
@@ -213,8 +225,9 @@ def main():
     return 1
 
 if __name__ == '__main__':
+    args = timings.parse_args(__doc__.strip().splitlines()[0])
     try:
-        sys.exit(main())
+        sys.exit(timings.run(main, args))
     except KeyboardInterrupt:
         print(f"\n\n{Cores.AMARELO}⚠️  Interrompido pelo usuário{Cores.RESET}")
         sys.exit(1)